@@ -1,9 +1,160 @@
+import asyncio
 import json
+import logging
+import math
+import re
+import functools
+import inspect
 import shutil
+import stat
 import subprocess
+import sys
 import os
-from typing import Any, List, Optional, Dict
-from .utils import logger, BTPError, BTPCommandError, BTPLoginError
+import random
+import time
+from collections import OrderedDict, defaultdict
+from itertools import chain
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Any, List, Mapping, Optional, Dict, Sequence, Tuple, Union
+from .utils import logger, json_loads, BTPError, BTPCommandError, BTPLoginError
+
+# Phrases in CLI output that indicate a missing or expired login session.
+# A single case-insensitive alternation scans each stream once. The patterns
+# are bytes so they run on the raw process output; all phrases are ASCII.
+_AUTH_RE = re.compile(
+    rb"not logged in|session expired|login required|authentication failed|authorization failed"
+    rb"|is not authenticated|unknown session|please log in",
+    re.IGNORECASE,
+)
+
+# Phrases that indicate BTP API rate limiting
+_RATE_RE = re.compile(rb"too many requests|retry after", re.IGNORECASE)
+
+# Maps newlines to spaces and drops carriage returns in a single pass
+_SANITIZE_TABLE = str.maketrans({"\n": " ", "\r": None})
+
+# Shared decoder used to pull a JSON document out of mixed CLI output
+_JSON_DECODER = json.JSONDecoder()
+
+# First character of a '--format json' document, as str or as a bytes slice
+_JSON_OPENERS = frozenset(("{", "[", b"{", b"["))
+
+
+def _env_number(name: str, default: float) -> float:
+    """Read a numeric setting from the environment, falling back to the default on bad input."""
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        value = math.nan
+    if not math.isfinite(value):
+        logger.warning("Ignoring invalid %s=%r, using %s instead.", name, raw, default)
+        return default
+    return value
+
+
+@functools.lru_cache(maxsize=1)
+def _find_btp_binary() -> Optional[str]:
+    """
+    Search for the 'btp' binary in common locations.
+
+    The result is cached for the lifetime of the process, so creating
+    further BTPCLI instances does not repeat the PATH scan and file checks.
+    """
+    # 1. Check in PATH
+    path_binary = shutil.which("btp")
+    if path_binary:
+        return path_binary
+
+    # 2. Check common platform-specific locations
+    common_locations = [
+        "/usr/local/bin/btp",
+        "/opt/homebrew/bin/btp",
+        os.path.expanduser("~/bin/btp"),
+        os.path.join(os.environ.get("PROGRAMFILES", "C:\\Program Files"), "sap", "btp", "btp.exe"),
+    ]
+    
+    for loc in common_locations:
+        # One stat call covers both the existence and the executable-bit check
+        try:
+            st = os.stat(loc)
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode) and st.st_mode & 0o111:
+            return loc
+    
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def _command_token(value: str) -> str:
+    """Normalize an action or group object (e.g. ' List') to its interned CLI spelling."""
+    return sys.intern(value.strip().lower())
+
+
+@functools.lru_cache(maxsize=512)
+def _option_arg(name: str) -> str:
+    """Normalize a parameter or flag name ('subaccount', '--subaccount') to its CLI option."""
+    return sys.intern("--" + name.strip().lstrip("-"))
+
+
+def _decode_result(command: List[str], returncode: int, stdout: bytes, stderr: bytes) -> "subprocess.CompletedProcess[str]":
+    """Decode captured process output for the error paths that need text."""
+    return subprocess.CompletedProcess(
+        command,
+        returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
+
+
+class _CommandSpec:
+    """
+    Pre-built argument skeleton for a fixed BTP CLI action, group and option set.
+
+    The wrapper methods always call the CLI with the same constant strings, so
+    the normalization done by run_command() happens once at import time.
+    Options are kept in sorted order, as (option, value index) pairs, so the
+    argv matches an equivalent run_command() call and shares its cache entry.
+    """
+    __slots__ = ("action", "group_object", "options")
+
+    def __init__(self, action: str, group_object: str, *option_names: str) -> None:
+        self.action = action
+        self.group_object = group_object
+        self.options = tuple(sorted((f"--{name}", index) for index, name in enumerate(option_names)))
+
+
+# --- Command Specs used by the BTPCLI wrapper methods ---
+_REGION_LIST = _CommandSpec("list", "accounts/region")
+_DIRECTORY_LIST = _CommandSpec("list", "accounts/directory")
+_SUBACCOUNT_LIST = _CommandSpec("list", "accounts/subaccount")
+_SUBACCOUNT_GET = _CommandSpec("get", "accounts/subaccount", "subaccount")
+_SUBACCOUNT_CREATE = _CommandSpec("create", "accounts/subaccount", "display-name", "region", "subdomain")
+_SUBACCOUNT_DELETE = _CommandSpec("delete", "accounts/subaccount", "subaccount")
+_GLOBAL_ACCOUNT_GET = _CommandSpec("get", "accounts/global-account")
+_USER_LIST = _CommandSpec("list", "security/user")
+_USER_GET = _CommandSpec("get", "security/user", "user")
+_ROLE_COLLECTION_LIST = _CommandSpec("list", "security/role-collection")
+_ROLE_COLLECTION_ASSIGN = _CommandSpec("assign", "security/role-collection", "name", "to-user")
+_ROLE_COLLECTION_UNASSIGN = _CommandSpec("unassign", "security/role-collection", "name", "from-user")
+_ENTITLEMENT_LIST = _CommandSpec("list", "accounts/entitlement", "subaccount")
+_ENTITLEMENT_ASSIGN = _CommandSpec("assign", "accounts/entitlement", "to-subaccount", "service-name", "plan-name", "amount")
+_ENTITLEMENT_REMOVE = _CommandSpec("remove", "accounts/entitlement", "subaccount", "service-name", "plan-name")
+_SERVICE_INSTANCE_LIST = _CommandSpec("list", "services/instance", "subaccount")
+_SERVICE_BINDING_LIST = _CommandSpec("list", "services/binding", "subaccount")
+_DESTINATION_LIST = _CommandSpec("list", "connectivity/destination", "subaccount")
+_DESTINATION_GET = _CommandSpec("get", "connectivity/destination", "subaccount", "name")
+_ENVIRONMENT_INSTANCE_LIST = _CommandSpec("list", "accounts/environment-instance", "subaccount")
+_SUBSCRIPTION_LIST = _CommandSpec("list", "accounts/subscription", "subaccount")
+
+_CONFIRM_FLAG = ("--confirm",)
+
+# Shared read-only stand-in for run_command() calls without params
+_EMPTY_PARAMS: Mapping[str, Any] = MappingProxyType({})
 
 class BTPCLI:
     """
@@ -14,50 +165,99 @@ class BTPCLI:
     maps CLI errors to Python exceptions with robust fail-safe mechanisms.
     """
 
-    def __init__(self, cli_path: Optional[str] = None):
+    # --- Response Cache Policy ---
+    # Only side-effect free actions are served from the in-process cache.
+    _READ_ACTIONS = frozenset({"list", "get"})
+
+    # Actions that may take several minutes on the platform side
+    _LONG_RUNNING_ACTIONS = frozenset({"create", "delete", "update", "subscribe", "migrate"})
+
+    # Groups whose data changes rarely get a longer time-to-live (seconds).
+    _CACHE_TTL_OVERRIDES = {
+        "accounts/region": 3600,
+        "accounts/global-account": 300,
+        "security/role-collection": 300,
+    }
+
+    # A write to the key group also makes cached reads of these groups stale.
+    _CACHE_DEPENDENCIES = {
+        "accounts/subaccount": (
+            "accounts/entitlement",
+            "accounts/environment-instance",
+            "accounts/subscription",
+            "services/instance",
+            "services/binding",
+            "connectivity/destination",
+        ),
+        "security/role-collection": ("security/user",),
+    }
+
+    def __init__(self, cli_path: Optional[str] = None, max_concurrency: Optional[int] = None,
+                 cache_ttl: Optional[float] = None, cache_size: int = 256) -> None:
         """
         Initialize the BTP CLI wrapper.
 
         Args:
             cli_path: Optional full path to the 'btp' executable. 
                       If not provided, it will search in the system PATH and common locations.
+            max_concurrency: Maximum number of 'btp' processes allowed to run at once.
+                      Defaults to the BTP_MAX_CONCURRENCY environment variable (or 8).
+                      Values below 1 are raised to 1.
+            cache_ttl: Seconds a cached 'list'/'get' response stays valid. Use 0 to disable caching.
+                      Defaults to the BTP_CACHE_TTL environment variable (or 30).
+            cache_size: Maximum number of responses kept in the LRU cache.
         """
-        self.cli_path = cli_path or self._find_btp_binary()
+        self.cli_path = cli_path or _find_btp_binary()
         
         if not self.cli_path:
             logger.warning("BTP CLI ('btp') not found in system PATH or common locations. Please ensure it is installed.")
 
-    def _find_btp_binary(self) -> Optional[str]:
-        """Search for the 'btp' binary in common locations."""
-        # 1. Check in PATH
-        path_binary = shutil.which("btp")
-        if path_binary:
-            return path_binary
-
-        # 2. Check common platform-specific locations
-        common_locations = [
-            "/usr/local/bin/btp",
-            "/opt/homebrew/bin/btp",
-            os.path.expanduser("~/bin/btp"),
-            os.path.join(os.environ.get("PROGRAMFILES", "C:\\Program Files"), "sap", "btp", "btp.exe"),
-        ]
-        
-        for loc in common_locations:
-            if os.path.exists(loc) and os.access(loc, os.X_OK):
-                return loc
-        
-        return None
+        # --- Command Construction ---
+        # We always prepend '--format json' to ensure machine-readable output.
+        # This is a core fail-safe for integration.
+        # Note: In modern BTP CLI versions, global options like --format must 
+        # come BEFORE the positional action/group to avoid parsing errors.
+        self._cmd_prefix: List[str] = [self.cli_path, "--format", "json"] if self.cli_path else []
+
+        # --- Environment Hardening ---
+        # We define specific environment variables to force non-interactive mode.
+        # The environment is snapshotted once here instead of copied per call.
+        self._env = {
+            **os.environ,
+            "CI": "true",  # Disables interactive prompts in most modern CLI tools
+            "PYTHONIOENCODING": "utf-8",
+        }
 
-    def _execute(self, args: List[str], timeout: int = 60) -> Dict[str, Any]:
+        # Caps the number of concurrent CLI child processes so that parallel
+        # tool calls do not overwhelm the local machine or the BTP API.
+        # A limit below 1 would make every call wait on the semaphore forever.
+        if max_concurrency is None:
+            max_concurrency = int(_env_number("BTP_MAX_CONCURRENCY", 8))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # LRU cache of read responses: (group_version, *argv) -> (expires_at, data)
+        self.cache_ttl = cache_ttl if cache_ttl is not None else _env_number("BTP_CACHE_TTL", 30)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, tuple[float, Any]]" = OrderedDict()
+        self._group_ver: Dict[str, int] = defaultdict(int)
+
+        # Reads currently running, keyed like the cache, shared by identical callers
+        self._pending: Dict[tuple, "asyncio.Future[Any]"] = {}
+
+    async def _execute_async(self, args: List[str], timeout: int = 60) -> Any:
         """
-        Execute a BTP command as a subprocess and parse the result.
+        Execute a BTP command as an asyncio subprocess and parse the result.
+
+        The event loop is never blocked while the CLI runs, so many BTP calls
+        can be in flight at once (bounded by the instance semaphore).
 
         Args:
             args: List of command arguments.
             timeout: Maximum execution time in seconds (default 60s).
 
         Returns:
-            Dict containing the parsed JSON output.
+            The parsed JSON output (usually a dict, sometimes a list).
 
         Raises:
             BTPLoginError: If authentication fails.
@@ -67,57 +267,49 @@ class BTPCLI:
         if not self.cli_path:
             raise BTPError("BTP CLI is not installed or not found. Please download it from https://tools.hana.ondemand.com/#cloud")
 
-        # --- Command Construction ---
-        # We always append '--format json' to ensure machine-readable output.
-        # This is a core fail-safe for integration.
-        # Note: In modern BTP CLI versions, global options like --format must 
-        # come BEFORE the positional action/group to avoid parsing errors.
-        full_command = [self.cli_path, "--format", "json"] + args
-        
-        # --- Environment Hardening ---
-        # We define specific environment variables to force non-interactive mode.
-        env = os.environ.copy()
-        env["CI"] = "true" # Disables interactive prompts in most modern CLI tools
-        env["PYTHONIOENCODING"] = "utf-8"
+        full_command = self._cmd_prefix + args
 
-        logger.debug(f"Executing: {' '.join(full_command)}")
+        # Only build the joined command line when DEBUG output is actually enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Executing: %s", " ".join(full_command))
 
-        try:
-            # Run the command with timeout and explicit encoding
-            result = subprocess.run(
-                full_command,
-                capture_output=True,
-                text=True,
-                check=False,
-                timeout=timeout,
-                encoding="utf-8",
-                env=env,
-                # Ensure it doesn't wait for input
-                stdin=subprocess.DEVNULL 
-            )
-        except subprocess.TimeoutExpired:
-             logger.error(f"BTP command timed out after {timeout}s: {' '.join(full_command)}")
-             raise BTPError(f"Command timed out after {timeout} seconds. The SAP BTP API might be slow or unresponsive.")
-        except FileNotFoundError:
-             raise BTPError(f"BTP CLI executable not found at {self.cli_path}")
-        except Exception as e:
-             raise BTPError(f"Unexpected error executing BTP CLI: {str(e)}")
+        async with self._semaphore:
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *full_command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    # Ensure it doesn't wait for input
+                    stdin=asyncio.subprocess.DEVNULL,
+                    env=self._env,
+                )
+            except FileNotFoundError:
+                raise BTPError(f"BTP CLI executable not found at {self.cli_path}")
+            except Exception as e:
+                raise BTPError(f"Unexpected error executing BTP CLI: {str(e)}")
+
+            try:
+                stdout_bytes, stderr_bytes = await asyncio.wait_for(proc.communicate(), timeout)
+                returncode = await proc.wait()
+            except asyncio.TimeoutError:
+                # Make sure the orphaned CLI process does not keep running in the background
+                proc.kill()
+                await proc.wait()
+                logger.error("BTP command timed out after %ss: %s", timeout, " ".join(full_command))
+                raise BTPError(f"Command timed out after {timeout} seconds. The SAP BTP API might be slow or unresponsive.")
+            except asyncio.CancelledError:
+                # A cancelled tool call must not leave its CLI process running either
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+                raise
 
         # --- Authentication & Connection Check ---
-        combined_output = (result.stdout + result.stderr).lower()
-        auth_triggers = [
-            "not logged in", 
-            "session expired", 
-            "login required", 
-            "authentication failed",
-            "authorization failed",
-            "is not authenticated",
-            "unknown session",
-            "please log in"
-        ]
-        
-        if any(trigger in combined_output for trigger in auth_triggers):
+        if _AUTH_RE.search(stderr_bytes) or _AUTH_RE.search(stdout_bytes):
             logger.error("BTP CLI authentication failure detected.")
+            result = _decode_result(full_command, returncode, stdout_bytes, stderr_bytes)
+            # Cached reads (including the one behind ping) must not outlive the session
+            self.invalidate_cache()
             raise BTPLoginError(
                 "You are not logged in to SAP BTP. Please run " + 
                 (f"'{self.cli_path} login'" if self.cli_path else "'btp login'") + 
@@ -128,16 +320,22 @@ class BTPCLI:
             )
 
         # --- Error Handling ---
-        if result.returncode != 0:
-            logger.error(f"BTP CLI command failed (Code {result.returncode})")
+        if returncode != 0:
+            logger.error("BTP CLI command failed (Code %s)", returncode)
+            result = _decode_result(full_command, returncode, stdout_bytes, stderr_bytes)
             
             # Specific handling for rate limiting or transient busy states
-            if "too many requests" in combined_output or "retry after" in combined_output:
+            if _RATE_RE.search(stderr_bytes) or _RATE_RE.search(stdout_bytes):
                 logger.warning("BTP API Rate limiting detected.")
                 # We could implement local sleep here if we wanted auto-retry
             
             # Attempt to extract error from JSON but be resilient to mixed output
             msg = self._extract_error_message(result)
+
+            # A failure may stem from outdated long-lived data (e.g. a region
+            # that no longer exists), so force those entries to be re-read.
+            for group in self._CACHE_TTL_OVERRIDES:
+                self.invalidate_cache(group)
             
             raise BTPCommandError(
                 f"BTP CLI Error: {msg}",
@@ -147,7 +345,9 @@ class BTPCLI:
             )
 
         # --- Success & Parsing ---
-        data = self._parse_json_safely(result.stdout, result.stderr)
+        # stdout stays bytes: orjson decodes and parses it in one pass, and it is
+        # only decoded in Python if the output needs the mixed-output recovery.
+        data = self._parse_json_safely(stdout_bytes, stderr_bytes.decode("utf-8", errors="replace"))
         
         # Handle Pagination (automatic following of next pages for list commands)
         # BTP CLI JSON usually contains a 'value' list and an optional '@odata.nextLink' or similar 
@@ -155,56 +355,62 @@ class BTPCLI:
         # If it's a list response from 'list' actions, we ensure it's structured.
         return data
 
-    def _execute_with_retry(self, args: List[str], timeout: int = 60, retries: int = 2) -> Dict[str, Any]:
+    async def _execute_with_retry(self, args: List[str], timeout: int = 60, retries: int = 2) -> Any:
         """
         A fail-safe execution wrapper that implements retries for transient failures.
         
         Logic:
         1. Retries are ONLY performed for base BTPError (timeouts, subprocess crashes).
         2. Retries are NOT performed for Auth errors or Logic errors (Command errors).
-        3. Uses exponential backoff (2s, 4s, etc.) to give the BTP API time to recover.
+        3. Uses increasing backoff (2s, 4s, etc. plus up to 1s of random jitter) to give
+           the BTP API time to recover. The wait is an asyncio.sleep, so other tool
+           calls keep running meanwhile.
         """
-        last_error = None
-        for attempt in range(retries + 1):
+        for attempt in range(retries):
             try:
-                return self._execute(args, timeout=timeout)
+                return await self._execute_async(args, timeout=timeout)
             except (BTPLoginError, BTPCommandError):
                 # Don't retry on logical errors or auth errors
                 raise
-            except BTPError as e:
-                last_error = e
-                if attempt < retries:
-                    logger.info(f"Retrying BTP command (attempt {attempt + 1}/{retries})...")
-                    import time
-                    time.sleep(2 * (attempt + 1)) # Exponential backoff
-                continue
-        raise last_error
-
-    def _extract_error_message(self, result: subprocess.CompletedProcess) -> str:
+            except BTPError:
+                logger.info("Retrying BTP command (attempt %d/%d)...", attempt + 1, retries)
+                # Backoff plus jitter so parallel callers don't retry in lockstep
+                await asyncio.sleep(2 * (attempt + 1) + random.random())
+        # Final attempt: any error now propagates to the caller
+        return await self._execute_async(args, timeout=timeout)
+
+    def _extract_error_message(self, result: "subprocess.CompletedProcess[str]") -> str:
         """Helper to extract a clean error message from CLI output."""
         try:
             # Sometimes BTP CLI outputs non-JSON warnings before the actual JSON error
             clean_stdout = result.stdout.strip()
-            if "{" in clean_stdout:
-                json_start = clean_stdout.find("{")
-                data = json.loads(clean_stdout[json_start:])
+            json_start = clean_stdout.find("{")
+            if json_start != -1:
+                # raw_decode reads just the error object in place: no slice copy,
+                # and trailing text after it does not break the parse.
+                data, _ = _JSON_DECODER.raw_decode(clean_stdout, json_start)
                 return data.get("error", {}).get("message") or data.get("message") or result.stderr.strip()
-        except:
+        except (ValueError, AttributeError):
             pass
         
         return result.stderr.strip() or result.stdout.strip() or "Unknown CLI error occurred."
 
-    def _parse_json_safely(self, stdout: str, stderr: str) -> Any:
+    def _parse_json_safely(self, stdout: Union[str, bytes], stderr: str) -> Any:
         """
         Deep JSON Recovery Engine.
         
         The BTP CLI often returns mixed output, combining useful data with
         unpredictable login prompts, warnings, or environment messages.
         
-        This method uses a multi-tiered strategy:
-        1. Direct JSON parsing (Standard Case).
-        2. Regex extraction of valid JSON structures within larger blocks of text.
-        3. Brute-force boundary search for '{' or '[' markers.
+        This method uses a two-tiered strategy:
+        1. Direct JSON parsing (Standard Case), attempted only when the output
+           starts like a JSON document so warning-prefixed output skips it.
+        2. Single forward pass over the lines: decoding starts at the first line
+           that opens an object or array, ignoring any leading warnings and
+           trailing noise. Unlike a greedy regex this never backtracks. If that
+           document is malformed or truncated, the raw output is returned.
+
+        stdout may be raw bytes; they are only decoded if the direct parse fails.
         """
         clean_stdout = stdout.strip()
         if not clean_stdout:
@@ -212,32 +418,28 @@ class BTPCLI:
             return {"status": "success", "message": "Command completed successfully.", "details": stderr.strip()}
 
         try:
-            # Multi-layered extraction strategy
-            
-            # 1. Direct parse
-            try:
-                return json.loads(clean_stdout)
-            except json.JSONDecodeError:
-                pass
-
-            # 2. Pattern matching for JSON objects/arrays embedded in text
-            # This handles cases where SAP prints "Warning: ..." before the JSON
-            json_pattern = r'(\{.*\}|\[.*\])'
-            match = re.search(json_pattern, clean_stdout, re.DOTALL)
-            if match:
-                return json.loads(match.group(1))
-
-            # 3. Last resort: manual boundary finding
-            if "{" in clean_stdout:
-                start = clean_stdout.find("{")
-                end = clean_stdout.rfind("}") + 1
-                return json.loads(clean_stdout[start:end])
-            elif "[" in clean_stdout:
-                start = clean_stdout.find("[")
-                end = clean_stdout.rfind("]") + 1
-                return json.loads(clean_stdout[start:end])
-            
-            raise json.JSONDecodeError("Manual boundary search failed", clean_stdout, 0)
+            # 1. Direct parse (JSONDecodeError from either library is a ValueError)
+            if clean_stdout[:1] in _JSON_OPENERS:
+                try:
+                    return json_loads(clean_stdout)
+                except ValueError:
+                    pass
+
+            if isinstance(clean_stdout, bytes):
+                clean_stdout = clean_stdout.decode("utf-8", errors="replace")
+
+            # 2. Skip lines such as "Warning: ..." that SAP prints before the JSON.
+            # Only the first line that opens a document is tried: if that one is
+            # truncated, a later (nested) line would decode to a fragment only.
+            offset = 0
+            for line in clean_stdout.splitlines(keepends=True):
+                body = line.lstrip()
+                if body[:1] in ("{", "["):
+                    data, _ = _JSON_DECODER.raw_decode(clean_stdout, offset + len(line) - len(body))
+                    return data
+                offset += len(line)
+
+            raise json.JSONDecodeError("No JSON document found in output", clean_stdout, 0)
             
         except (json.JSONDecodeError, ValueError):
             logger.warning("BTP CLI did not return valid JSON. Returning raw output.")
@@ -251,169 +453,293 @@ class BTPCLI:
 
     def _sanitize_param(self, value: Any) -> str:
         """Sanitize parameters to prevent command injection risks or shell breakage."""
-        val_str = str(value)
+        # Numbers and booleans cannot contain line breaks or padding
+        if isinstance(value, (int, bool)):
+            return str(value)
         # BTP CLI specific sanitation: remove or escape characters that might break 
         # parameter parsing even in subprocess list mode.
-        return val_str.strip().replace("\n", " ").replace("\r", "")
+        return str(value).strip().translate(_SANITIZE_TABLE)
 
-    def run_command(self, action: str, group_object: str, params: Dict[str, Any] = {}, flags: List[str] = []) -> Any:
+    async def run_command(self, action: str, group_object: str, params: Optional[Mapping[str, Any]] = None,
+                          flags: Optional[Sequence[str]] = None) -> Any:
         """
         A generic helper to build and run BTP CLI commands with sanitation.
+
+        Params and flags are emitted in sorted order so that equivalent calls
+        share the same response cache entry. Results of 'list'/'get' commands
+        are shared between callers and must not be modified (see _dispatch).
         """
-        # Sanitation to prevent command injection even though subprocess.run([list]) is safe
-        action = str(action).strip().lower()
-        group_object = str(group_object).strip().lower()
+        # Sanitation to prevent command injection even though subprocess.run([list]) is safe.
+        # Names come from a small vocabulary, so their normalized forms are memoized.
+        action = _command_token(str(action))
+        group_object = _command_token(str(group_object))
         
-        args = [action, group_object]
-        
-        for key, value in params.items():
-            key_clean = str(key).strip().lstrip("-")
-            args.append(f"--{key_clean}")
-            args.append(self._sanitize_param(value))
-            
-        for flag in flags:
-            flag_clean = str(flag).strip().lstrip("-")
-            args.append(f"--{flag_clean}")
+        params = params or _EMPTY_PARAMS
+        flags = flags or ()
+
+        param_args = chain.from_iterable(
+            (option, self._sanitize_param(value))
+            for option, value in sorted(
+                ((_option_arg(str(key)), value) for key, value in params.items()),
+                # Sort on the option name only: values may not be comparable
+                key=itemgetter(0),
+            )
+        )
+        flag_args = sorted(_option_arg(str(flag)) for flag in flags)
+        args = [action, group_object, *param_args, *flag_args]
+
+        return await self._dispatch(action, group_object, args)
+
+    async def _run_spec(self, spec: "_CommandSpec", *values: Any, flags: Tuple[str, ...] = ()) -> Any:
+        """
+        Run a pre-built command from one of the wrapper methods.
+
+        Values map positionally onto the option names the spec was declared
+        with; options whose value is None are omitted. Flags must already
+        carry their '--' prefix.
+        """
+        args = [
+            spec.action,
+            spec.group_object,
+            *chain.from_iterable(
+                (option, self._sanitize_param(values[index]))
+                for option, index in spec.options
+                if values[index] is not None
+            ),
+            *flags,
+        ]
+        return await self._dispatch(spec.action, spec.group_object, args)
+
+    async def _dispatch(self, action: str, group_object: str, args: List[str]) -> Any:
+        """
+        Execute normalized arguments through the response cache.
+
+        Read actions ('list', 'get') are served from the cache when a fresh
+        entry exists, and concurrent identical reads share a single CLI
+        process. Any other action invalidates the cached reads of its group
+        (and dependent groups) once it has run.
 
+        Read results are shared: cache hits and coalesced callers all receive
+        the same dict/list object. Callers must treat them as read-only and
+        copy before modifying, or later callers would see the changes.
+        """
         # Increased timeout for potentially heavy operations like creation
-        timeout = 300 if action in ["create", "delete", "update", "subscribe", "migrate"] else 60
-        return self._execute_with_retry(args, timeout=timeout)
+        timeout = 300 if action in self._LONG_RUNNING_ACTIONS else 60
+
+        if action not in self._READ_ACTIONS:
+            try:
+                return await self._execute_with_retry(args, timeout=timeout)
+            finally:
+                # Even a failed write may have partially changed the platform state
+                self.invalidate_cache(group_object)
+
+        # Embedding the group's version makes entries from before the
+        # last write to that group unreachable without scanning the cache.
+        cache_key = (self._group_ver[group_object], *args)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.debug("Cache hit: %s %s", action, group_object)
+            return cached
+
+        # Coalesce identical reads that are already in flight
+        task = self._pending.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._execute_with_retry(args, timeout=timeout))
+            self._pending[cache_key] = task
+            task.add_done_callback(functools.partial(self._finish_read, cache_key, group_object))
+        # Shield the shared task so one cancelled caller does not cancel the others
+        return await asyncio.shield(task)
+
+    def _finish_read(self, key: Tuple[Any, ...], group_object: str, task: "asyncio.Future[Any]") -> None:
+        """Done-callback for a shared read: cache the result and release the in-flight slot."""
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        # Retrieving the exception also prevents 'never retrieved' warnings
+        if not task.cancelled() and task.exception() is None:
+            self._cache_put(key, group_object, task.result())
+
+    def _cache_get(self, key: Tuple[Any, ...]) -> Any:
+        """Return a fresh cached response for key, or None if missing or expired."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if time.monotonic() >= expires_at:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return data
 
-    def ping(self) -> bool:
+    def _cache_put(self, key: Tuple[Any, ...], group_object: str, data: Any) -> None:
+        """Store a response, evicting the least recently used entries beyond cache_size."""
+        ttl = self._CACHE_TTL_OVERRIDES.get(group_object, self.cache_ttl)
+        if ttl <= 0 or self.cache_ttl <= 0:
+            return
+        self._cache[key] = (time.monotonic() + ttl, data)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def invalidate_cache(self, group_object: Optional[str] = None) -> None:
+        """
+        Drop cached responses.
+
+        Group invalidation only bumps version counters, so it costs the same
+        regardless of cache size; stale entries age out through LRU eviction.
+
+        Args:
+            group_object: Only drop entries for this group and the groups that
+                          depend on it. If omitted, the whole cache is cleared.
+        """
+        if group_object is None:
+            self._cache.clear()
+            return
+        self._group_ver[group_object] += 1
+        for dependent in self._CACHE_DEPENDENCIES.get(group_object, ()):
+            self._group_ver[dependent] += 1
+
+    async def gather_calls(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """
+        Run several independent wrapper methods concurrently.
+
+        Args:
+            calls: List of (method_name, kwargs) pairs, e.g.
+                   [("list_entitlements", {"subaccount_id": "..."}), ("list_regions", {})].
+
+        Returns:
+            Results in the same order as the calls. A failed call yields its
+            exception instance instead of aborting the whole batch.
+        """
+        coroutines = []
+        for name, kwargs in calls:
+            method = getattr(self, name, None) if not name.startswith("_") else None
+            if method is None or not inspect.iscoroutinefunction(method):
+                raise ValueError(f"Unknown BTP CLI method: {name}")
+            coroutines.append(method(**kwargs))
+        return await asyncio.gather(*coroutines, return_exceptions=True)
+
+    async def gather_for_subaccounts(self, subaccount_ids: List[str], method_name: str) -> Dict[str, Any]:
+        """
+        Fan a per-subaccount method (e.g. 'list_service_instances') out across many subaccounts.
+
+        Returns:
+            Dict mapping each subaccount ID to its result (or exception).
+        """
+        results = await self.gather_calls([(method_name, {"subaccount_id": sid}) for sid in subaccount_ids])
+        return dict(zip(subaccount_ids, results))
+
+    async def ping(self) -> bool:
         """
         Check if the BTP CLI is accessible and the user is authenticated.
         Returns True if successful, raises exception otherwise.
         """
         # We use a simple 'get global-account' as a health check
-        self.get_global_account()
+        await self.get_global_account()
         return True
 
-    def list_regions(self) -> Any:
+    async def list_regions(self) -> Any:
         """List all available technical regions for the current global account."""
-        return self.run_command("list", "accounts/region")
+        return await self._run_spec(_REGION_LIST)
 
-    def list_directories(self) -> Any:
+    async def list_directories(self) -> Any:
         """List all directories in the global account."""
-        return self.run_command("list", "accounts/directory")
+        return await self._run_spec(_DIRECTORY_LIST)
 
     # ==========================
     # --- Account Management ---
     # ==========================
 
-    def list_subaccounts(self) -> Any:
+    async def list_subaccounts(self) -> Any:
         """Fetch all subaccounts accessible to the current user."""
-        return self.run_command("list", "accounts/subaccount")
+        return await self._run_spec(_SUBACCOUNT_LIST)
 
-    def get_subaccount(self, subaccount_id: str) -> Any:
+    async def get_subaccount(self, subaccount_id: str) -> Any:
         """Get detailed information for a specific subaccount ID."""
-        return self.run_command("get", "accounts/subaccount", {"subaccount": subaccount_id})
+        return await self._run_spec(_SUBACCOUNT_GET, subaccount_id)
 
-    def create_subaccount(self, display_name: str, region: str, subdomain: str) -> Any:
+    async def create_subaccount(self, display_name: str, region: str, subdomain: str) -> Any:
         """Create a new subaccount in the current global account."""
-        return self.run_command("create", "accounts/subaccount", {
-            "display-name": display_name,
-            "region": region,
-            "subdomain": subdomain
-        })
+        return await self._run_spec(_SUBACCOUNT_CREATE, display_name, region, subdomain)
 
-    def delete_subaccount(self, subaccount_id: str, confirm: bool = False) -> Any:
+    async def delete_subaccount(self, subaccount_id: str, confirm: bool = False) -> Any:
         """Delete an existing subaccount."""
-        flags = ["confirm"] if confirm else []
-        return self.run_command("delete", "accounts/subaccount", {"subaccount": subaccount_id}, flags)
+        flags = _CONFIRM_FLAG if confirm else ()
+        return await self._run_spec(_SUBACCOUNT_DELETE, subaccount_id, flags=flags)
 
-    def get_global_account(self) -> Any:
+    async def get_global_account(self) -> Any:
         """Retrieve details about the current global account."""
-        return self.run_command("get", "accounts/global-account")
+        return await self._run_spec(_GLOBAL_ACCOUNT_GET)
 
     # ================
     # --- Security ---
     # ================
 
-    def list_users(self) -> Any:
+    async def list_users(self) -> Any:
         """List all users in the current global account context."""
-        return self.run_command("list", "security/user")
+        return await self._run_spec(_USER_LIST)
 
-    def get_user(self, email: str) -> Any:
+    async def get_user(self, email: str) -> Any:
         """Get details for a specific user by their email address."""
-        return self.run_command("get", "security/user", {"user": email})
+        return await self._run_spec(_USER_GET, email)
 
-    def list_role_collections(self) -> Any:
+    async def list_role_collections(self) -> Any:
         """List all available role collections."""
-        return self.run_command("list", "security/role-collection")
+        return await self._run_spec(_ROLE_COLLECTION_LIST)
 
-    def assign_role_collection(self, role_collection_name: str, user_email: str) -> Any:
+    async def assign_role_collection(self, role_collection_name: str, user_email: str) -> Any:
         """Assign a specific role collection to a user."""
-        return self.run_command("assign", "security/role-collection", {
-            "name": role_collection_name,
-            "to-user": user_email
-        })
+        return await self._run_spec(_ROLE_COLLECTION_ASSIGN, role_collection_name, user_email)
 
-    def unassign_role_collection(self, role_collection_name: str, user_email: str) -> Any:
+    async def unassign_role_collection(self, role_collection_name: str, user_email: str) -> Any:
         """Unassign a role collection from a user."""
-        return self.run_command("unassign", "security/role-collection", {
-            "name": role_collection_name,
-            "from-user": user_email
-        })
+        return await self._run_spec(_ROLE_COLLECTION_UNASSIGN, role_collection_name, user_email)
 
     # ====================
     # --- Entitlements ---
     # ====================
 
-    def list_entitlements(self, subaccount_id: str) -> Any:
+    async def list_entitlements(self, subaccount_id: str) -> Any:
         """List all service plans and quotas (entitlements) assigned to a subaccount."""
-        return self.run_command("list", "accounts/entitlement", {"subaccount": subaccount_id})
+        return await self._run_spec(_ENTITLEMENT_LIST, subaccount_id)
 
-    def assign_entitlement(self, subaccount_id: str, service_name: str, service_plan: str, amount: Optional[int] = None) -> Any:
+    async def assign_entitlement(self, subaccount_id: str, service_name: str, service_plan: str, amount: Optional[int] = None) -> Any:
         """Allocate or update an entitlement quota for a specific subaccount."""
-        params = {
-            "to-subaccount": subaccount_id,
-            "service-name": service_name,
-            "plan-name": service_plan
-        }
-        if amount is not None:
-            params["amount"] = str(amount)
-        return self.run_command("assign", "accounts/entitlement", params)
+        # 'amount' is omitted from the command when None
+        return await self._run_spec(_ENTITLEMENT_ASSIGN, subaccount_id, service_name, service_plan, amount)
 
-    def remove_entitlement(self, subaccount_id: str, service_name: str, service_plan: str) -> Any:
+    async def remove_entitlement(self, subaccount_id: str, service_name: str, service_plan: str) -> Any:
         """Remove an entitlement from a subaccount."""
-        return self.run_command("remove", "accounts/entitlement", {
-            "subaccount": subaccount_id,
-            "service-name": service_name,
-            "plan-name": service_plan
-        })
+        return await self._run_spec(_ENTITLEMENT_REMOVE, subaccount_id, service_name, service_plan)
 
     # ================
     # --- Services ---
     # ================
 
-    def list_service_instances(self, subaccount_id: str) -> Any:
+    async def list_service_instances(self, subaccount_id: str) -> Any:
         """List all service instances created in a specific subaccount."""
-        return self.run_command("list", "services/instance", {"subaccount": subaccount_id})
+        return await self._run_spec(_SERVICE_INSTANCE_LIST, subaccount_id)
 
-    def list_service_bindings(self, subaccount_id: str) -> Any:
+    async def list_service_bindings(self, subaccount_id: str) -> Any:
          """List all service bindings in a specific subaccount."""
-         return self.run_command("list", "services/binding", {"subaccount": subaccount_id})
+         return await self._run_spec(_SERVICE_BINDING_LIST, subaccount_id)
 
     # ====================
     # --- Connectivity ---
     # ====================
 
-    def list_destinations(self, subaccount_id: str) -> Any:
+    async def list_destinations(self, subaccount_id: str) -> Any:
         """List all destinations defined in a subaccount."""
-        return self.run_command("list", "connectivity/destination", {"subaccount": subaccount_id})
+        return await self._run_spec(_DESTINATION_LIST, subaccount_id)
 
-    def get_destination(self, subaccount_id: str, destination_name: str) -> Any:
+    async def get_destination(self, subaccount_id: str, destination_name: str) -> Any:
         """Get details of a specific destination configuration."""
-        return self.run_command("get", "connectivity/destination", {
-            "subaccount": subaccount_id,
-            "name": destination_name
-        })
+        return await self._run_spec(_DESTINATION_GET, subaccount_id, destination_name)
 
-    def list_environment_instances(self, subaccount_id: str) -> Any:
+    async def list_environment_instances(self, subaccount_id: str) -> Any:
         """List all environment instances (CF, Kyma, etc.) in a specific subaccount."""
-        return self.run_command("list", "accounts/environment-instance", {"subaccount": subaccount_id})
+        return await self._run_spec(_ENVIRONMENT_INSTANCE_LIST, subaccount_id)
 
-    def list_subscriptions(self, subaccount_id: str) -> Any:
+    async def list_subscriptions(self, subaccount_id: str) -> Any:
         """List all multi-tenant application subscriptions in a specific subaccount."""
-        return self.run_command("list", "accounts/subscription", {"subaccount": subaccount_id})
+        return await self._run_spec(_SUBSCRIPTION_LIST, subaccount_id)
 
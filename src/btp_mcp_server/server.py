@@ -1,11 +1,14 @@
-import json
+import asyncio
+import inspect
+import logging
 import re
-from typing import Any, Dict, List, Optional, Union
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from mcp.server.fastmcp import FastMCP
-from pydantic import Field
+from pydantic import BaseModel, Field
 
 from .btp_cli import BTPCLI, BTPError, BTPCommandError, BTPLoginError
-from .utils import logger
+from .utils import logger, json_dumps
 
 # --- FastMCP Initialization ---
 mcp = FastMCP("SAP BTP CLI Manager")
@@ -18,7 +21,27 @@ import os
 cli_path = os.environ.get("BTP_CLI_PATH")
 cli = BTPCLI(cli_path=cli_path)
 
+# Indented JSON is easier to read when debugging, but costs serialization time
+# and LLM tokens. Responses are compact unless BTP_PRETTY=1 is set.
+_PRETTY = os.environ.get("BTP_PRETTY", "0") == "1"
+
+# --- Input Validators ---
+# Compiled once at import instead of going through re's pattern cache per call.
+_GUID_RE = re.compile(r'^[0-9a-fA-F-]+$')
+_REGION_RE = re.compile(r'^[a-z0-9-]+$')
+_SUBDOMAIN_RE = re.compile(r'^[a-z][a-z0-9-]{0,62}$')
+_EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+$')
+_INVALID_GUID = "❌ Error: Invalid subaccount ID format. It should be a technical GUID."
+_INVALID_EMAIL = "❌ Error: Please provide a valid email address."
+
+# --- Shared Tool Parameters ---
+# Built once and reused by every tool that takes the same argument.
+_SUBACCOUNT_ID_FIELD = Field(..., description="The ID of the subaccount.")
+_SUBACCOUNT_IDS_FIELD = Field(..., description="IDs of the subaccounts to query.")
+
 # --- Response Formatting ---
+_NO_DATA = "Command completed successfully with no return data."
+
 def format_response(data: Any) -> str:
     """
     Standardizes and beautifies the output format for all tools. 
@@ -29,86 +52,151 @@ def format_response(data: Any) -> str:
     2. Handle Lists/Dicts: 
        - If the result is a wrapper dict with an 'items' key (common in BTP CLI),
          it unwraps it to provide a cleaner list to the LLM.
-       - Converts to pretty-printed JSON (indent=2) for max readability.
+       - Converts to compact JSON (indented by two spaces when BTP_PRETTY=1).
     3. Handle Strings/Primitives: Returns stripped string.
     """
     if data is None:
-        return "Command completed successfully with no return data."
-    
-    if isinstance(data, (dict, list)):
+        return _NO_DATA
+
+    # Parsed CLI output is a plain dict, so the exact type check short-circuits
+    # isinstance in the common case; dict subclasses are still unwrapped
+    if type(data) is dict or isinstance(data, dict):
         # If the result contains a single key with the list of items, simplify it
-        if isinstance(data, dict) and len(data) == 1 and "items" in data:
-             data = data["items"]
-        return json.dumps(data, indent=2)
+        if len(data) == 1 and "items" in data:
+            data = data["items"]
+        return json_dumps(data, pretty=_PRETTY)
+    if isinstance(data, list):
+        return json_dumps(data, pretty=_PRETTY)
     
     return str(data).strip()
 
+# --- Error Translation ---
+# The CLI path is fixed for the lifetime of the server, so the login steps are built once.
+_LOGIN_HINT = (
+    "To fix this, please follow these steps:\n"
+    "1. Open your local terminal.\n"
+    f"2. Run: {cli.cli_path or 'btp'} login\n"
+    "3. Follow the prompts to authenticate.\n"
+    "4. Once authenticated, try your request again."
+)
+
+def _login_error_response(e: BTPError) -> str:
+    return f"❌ AUTHENTICATION ERROR: {str(e)}\n\n{_LOGIN_HINT}"
+
+def _command_error_response(e: BTPError) -> str:
+    error_msg = str(e)
+    lowered = error_msg.lower()
+    hint = ""
+    if "entitlement" in lowered and "quota" in lowered:
+        hint = "\n💡 TIP: Check if your global account has enough quota for this service plan using 'btp_list_entitlements'."
+    elif "region" in lowered:
+        hint = "\n💡 TIP: Run 'btp_list_regions' to see available technical region IDs."
+    elif "already exists" in lowered:
+        hint = "\n💡 TIP: Subdomains must be globally unique across all of BTP, not just your account."
+
+    return f"⚠️ BTP CLI ERROR: {error_msg}{hint}\n(Return Code: {e.return_code})"
+
+def _server_error_response(e: BTPError) -> str:
+    return f"🚫 BTP SERVER ERROR: {str(e)}\nEnsure your internet connection is stable and the SAP BTP API is online."
+
+# Exception type -> response builder, resolved by a hash lookup along the MRO
+_ERR_HANDLERS: Dict[type, Callable[[Any], str]] = {
+    BTPLoginError: _login_error_response,
+    BTPCommandError: _command_error_response,
+    BTPError: _server_error_response,
+}
+
 def handle_btp_errors(func):
     """
     A unified higher-order decorator that wraps all tool execution.
     It translates internal Python exceptions into human-friendly (and AI-friendly) 
     response strings.
     
-    Error Mapping:
+    Error Mapping (see _ERR_HANDLERS):
     - BTPLoginError: Prompts the user with specific CLI login commands.
     - BTPCommandError: Captures CLI-level failures (invalid IDs, permissions) and 
       appends helpful 'TIP' hints based on natural language analysis of the error.
     - BTPError: Catches foundational execution errors (timeouts, missing binaries).
     - Exception: Catch-all for unexpected internal logic bugs to prevent server crash.
+
+    Coroutine tools get an async wrapper that awaits them; plain functions
+    (e.g. tools that never reach the CLI) keep a synchronous wrapper.
     """
+    def translate(e: Exception) -> str:
+        for exc_type in type(e).__mro__:
+            handler = _ERR_HANDLERS.get(exc_type)
+            if handler is not None:
+                return handler(e)
+        # The full traceback is only formatted when debug logging is enabled
+        logger.error("Unexpected error in tool %s: %s", func.__name__, e,
+                     exc_info=logger.isEnabledFor(logging.DEBUG))
+        return f"❌ INTERNAL ERROR: An unexpected error occurred: {str(e)}"
+
+    # wraps() also copies __wrapped__, which FastMCP follows to build the tool schema
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                return translate(e)
+        return async_wrapper
+
+    @wraps(func)
     def wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
-        except BTPLoginError as e:
-            return (
-                f"❌ AUTHENTICATION ERROR: {str(e)}\n\n"
-                "To fix this, please follow these steps:\n"
-                "1. Open your local terminal.\n"
-                f"2. Run: {cli.cli_path or 'btp'} login\n"
-                "3. Follow the prompts to authenticate.\n"
-                "4. Once authenticated, try your request again."
-            )
-        except BTPCommandError as e:
-            error_msg = str(e)
-            hint = ""
-            if "entitlement" in error_msg.lower() and "quota" in error_msg.lower():
-                hint = "\n💡 TIP: Check if your global account has enough quota for this service plan using 'btp_list_entitlements'."
-            elif "region" in error_msg.lower():
-                hint = "\n💡 TIP: Run 'btp_list_regions' to see available technical region IDs."
-            elif "already exists" in error_msg.lower():
-                hint = "\n💡 TIP: Subdomains must be globally unique across all of BTP, not just your account."
-                
-            return f"⚠️ BTP CLI ERROR: {error_msg}{hint}\n(Return Code: {e.return_code})"
-        except BTPError as e:
-            return f"🚫 BTP SERVER ERROR: {str(e)}\nEnsure your internet connection is stable and the SAP BTP API is online."
         except Exception as e:
-            logger.exception(f"Unexpected error in tool {func.__name__}")
-            return f"❌ INTERNAL ERROR: An unexpected error occurred: {str(e)}"
-    # Preserve function metadata for FastMCP
-    wrapper.__name__ = func.__name__
-    wrapper.__doc__ = func.__doc__
+            return translate(e)
     return wrapper
 
+# --- Pass-through Tool Factory ---
+def _cli_tool(name: str, doc: str, **params: Tuple[Any, Any]) -> Callable[..., Awaitable[str]]:
+    """
+    Build and register a tool that forwards its arguments unchanged to the
+    BTPCLI method of the same name (without the 'btp_' prefix).
+
+    Each keyword maps a parameter name to its (annotation, Field) pair. The
+    generated signature gives FastMCP the same schema as a handwritten tool.
+    Tools that validate their input before calling the CLI stay handwritten.
+    """
+    method_name = name[len("btp_"):]
+
+    async def tool(*args: Any, **kwargs: Any) -> str:
+        return format_response(await getattr(cli, method_name)(*args, **kwargs))
+
+    tool.__name__ = tool.__qualname__ = name
+    tool.__doc__ = doc
+    setattr(tool, "__signature__", inspect.Signature(
+        [
+            inspect.Parameter(param, inspect.Parameter.POSITIONAL_OR_KEYWORD, default=field, annotation=annotation)
+            for param, (annotation, field) in params.items()
+        ],
+        return_annotation=str,
+    ))
+    tool.__annotations__ = {**{param: annotation for param, (annotation, _) in params.items()}, "return": str}
+    return mcp.tool()(handle_btp_errors(tool))
+
 # ==================
 # --- Core Tools ---
 # ==================
 
 @mcp.tool()
 @handle_btp_errors
-def btp_ping() -> str:
+async def btp_ping() -> str:
     """
     Diagnostic tool to verify connectivity and login status.
     Use this if you are unsure if the BTP CLI is configured correctly.
     """
-    cli.ping()
+    await cli.ping()
     return "✅ Success: BTP CLI is accessible and you are currently logged in."
 
 @mcp.tool()
 @handle_btp_errors
-def btp_execute_command(
+async def btp_execute_command(
     action: str = Field(..., description="The verb (e.g., 'list', 'get', 'create', 'delete', 'assign')."),
     group_object: str = Field(..., description="The resource category (e.g., 'accounts/subaccount', 'security/role-collection')."),
-    parameters: Dict[str, Any] = Field(default_factory=dict, description="Key-value pairs for parameters. Do NOT include '--' prefix. Example: {'subaccount': 'id'}"),
+    parameters: Dict[str, Union[str, int, bool]] = Field(default_factory=dict, description="Key-value pairs for parameters. Do NOT include '--' prefix. Example: {'subaccount': 'id'}"),
     flags: List[str] = Field(default_factory=list, description="List of boolean flags. Do NOT include '--' prefix. Example: ['confirm', 'verbose']")
 ) -> str:
     """
@@ -117,33 +205,166 @@ def btp_execute_command(
     
     Safety: This tool automatically handles JSON formatting and error detection.
     """
-    result = cli.run_command(action, group_object, parameters, flags)
+    result = await cli.run_command(action, group_object, parameters, flags)
     return format_response(result)
 
+class BulkCommand(BaseModel):
+    """A single generic BTP CLI command inside a bulk request."""
+    action: str = Field(..., description="The verb (e.g., 'list', 'get').")
+    group_object: str = Field(..., description="The resource category (e.g., 'services/instance').")
+    parameters: Dict[str, Union[str, int, bool]] = Field(default_factory=dict, description="Key-value pairs for parameters, without '--' prefix.")
+    flags: List[str] = Field(default_factory=list, description="Boolean flags, without '--' prefix.")
+
+@mcp.tool()
+@handle_btp_errors
+async def btp_bulk_execute(
+    commands: List[BulkCommand] = Field(..., description="Independent commands to run concurrently. Results are returned in the same order.")
+) -> str:
+    """
+    Run several independent SAP BTP CLI commands in one call.
+    Use this to fan out reads, e.g. listing service instances for many subaccounts at once.
+    
+    A failing command does not abort the others; its entry contains an 'error' message instead.
+    """
+    results = await asyncio.gather(
+        *[cli.run_command(c.action, c.group_object, c.parameters, c.flags) for c in commands],
+        return_exceptions=True
+    )
+    return format_response([
+        {"error": str(r)} if isinstance(r, Exception) else r
+        for r in results
+    ])
+
+# Read-only tools that may be combined in a btp_batch request
+_BATCH_TOOLS = frozenset({
+    "btp_get_global_account", "btp_list_regions", "btp_list_directories",
+    "btp_list_subaccounts", "btp_get_subaccount",
+    "btp_list_users", "btp_get_user", "btp_list_role_collections",
+    "btp_list_entitlements", "btp_list_service_instances", "btp_list_service_bindings",
+    "btp_list_environment_instances", "btp_list_subscriptions",
+    "btp_list_destinations", "btp_get_destination",
+})
+
+# Input checks of the handwritten tools, applied to the same tools inside a batch
+_BATCH_VALIDATORS = {
+    "btp_get_subaccount": (("subaccount_id", _GUID_RE, _INVALID_GUID),),
+    "btp_get_user": (("email", _EMAIL_RE, _INVALID_EMAIL),),
+}
+
+_BATCH_INPUT = "$result"
+
+class BatchCall(BaseModel):
+    """A single read-only tool call inside a btp_batch request."""
+    call_id: int = Field(..., description="Unique ID of this call within the batch.")
+    tool: str = Field(..., description="Name of a read-only tool, e.g. 'btp_list_entitlements'.")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Arguments of the tool, e.g. {'subaccount_id': '...'}.")
+    input_from: int = Field(-1, description="call_id whose result feeds this call, or -1 for none.")
+
+def _resolve_batch_input(value: Any, source: Any, input_from: int) -> Any:
+    """
+    Replace a '$result' placeholder with the output of the input call.
+    A dotted path selects a nested value, e.g. '$result.value.0.guid'.
+    The selected value must be a plain string, number or boolean.
+    """
+    if not isinstance(value, str) or (value != _BATCH_INPUT and not value.startswith(_BATCH_INPUT + ".")):
+        return value
+    if input_from < 0:
+        raise ValueError(f"INVALID_ARGUMENT: '{value}' requires 'input_from' to be set.")
+    node = source
+    try:
+        for part in value[len(_BATCH_INPUT) + 1:].split(".") if value != _BATCH_INPUT else ():
+            node = node[int(part)] if isinstance(node, list) else node[part]
+    except (KeyError, IndexError, TypeError, ValueError):
+        raise ValueError(f"INVALID_ARGUMENT: cannot resolve '{value}' from the input call result.")
+    if not isinstance(node, (str, int, bool)):
+        raise ValueError(f"INVALID_ARGUMENT: '{value}' must resolve to a string, number or boolean, not {type(node).__name__}.")
+    return node
+
+async def _run_batch_call(call: BatchCall, source: Any) -> Any:
+    if call.tool not in _BATCH_TOOLS:
+        raise ValueError(f"INVALID_ARGUMENT: '{call.tool}' cannot be used in a batch.")
+    params = {key: _resolve_batch_input(value, source, call.input_from) for key, value in call.params.items()}
+    for param, pattern, message in _BATCH_VALIDATORS.get(call.tool, ()):
+        value = params.get(param)
+        if not isinstance(value, str) or not pattern.match(value):
+            raise ValueError(message)
+    return await getattr(cli, call.tool[len("btp_"):])(**params)
+
+@mcp.tool()
+@handle_btp_errors
+async def btp_batch(
+    calls: List[BatchCall] = Field(..., description="Read-only tool calls. Calls without 'input_from' run concurrently.")
+) -> str:
+    """
+    Run several read-only tools in a single call, e.g. list the subaccounts and then
+    the entitlements of the first one.
+
+    A call with 'input_from' waits for that call and may reference its output in
+    'params' as '$result' or a path such as '$result.value.0.guid'. Independent calls
+    run concurrently. If a call fails, every call depending on it fails as well.
+    Returns a mapping of call_id to result (or an 'error' message).
+    """
+    if len({c.call_id for c in calls}) != len(calls):
+        return "❌ Error: call_id values must be unique within a batch."
+
+    results: Dict[int, Any] = {}
+    failed: Dict[int, str] = {}
+    pending = list(calls)
+    # Run the dependency graph layer by layer: each pass executes every call whose input is available
+    while pending:
+        ready = [c for c in pending if c.input_from < 0 or c.input_from in results or c.input_from in failed]
+        if not ready:
+            for c in pending:
+                failed[c.call_id] = f"INVALID_ARGUMENT: input call {c.input_from} is missing or part of a cycle."
+            break
+        ready_ids = {c.call_id for c in ready}
+        pending = [c for c in pending if c.call_id not in ready_ids]
+
+        runnable = []
+        for c in ready:
+            if c.input_from in failed:
+                failed[c.call_id] = f"INVALID_ARGUMENT: input call {c.input_from} failed."
+            else:
+                runnable.append(c)
+
+        outcomes = await asyncio.gather(
+            *[_run_batch_call(c, results.get(c.input_from)) for c in runnable],
+            return_exceptions=True
+        )
+        for c, outcome in zip(runnable, outcomes):
+            if isinstance(outcome, Exception):
+                failed[c.call_id] = str(outcome)
+            else:
+                results[c.call_id] = outcome
+
+    return format_response({
+        c.call_id: {"error": failed[c.call_id]} if c.call_id in failed else results[c.call_id]
+        for c in calls
+    })
+
 # ==================================
 # --- Account Management Tools ---
 # ==================================
 
-@mcp.tool()
-@handle_btp_errors
-def btp_list_subaccounts() -> str:
-    """List all subaccounts in the current global account including their IDs, names, and states."""
-    return format_response(cli.list_subaccounts())
+btp_list_subaccounts = _cli_tool(
+    "btp_list_subaccounts",
+    "List all subaccounts in the current global account including their IDs, names, and states.",
+)
 
 @mcp.tool()
 @handle_btp_errors
-def btp_get_subaccount(
+async def btp_get_subaccount(
     subaccount_id: str = Field(..., description="The unique technical ID (GUID) of the subaccount.")
 ) -> str:
     """Get comprehensive details for a specific subaccount, including region, subdomain, and parent IDs."""
-    if not re.match(r'^[0-9a-fA-F-]+$', subaccount_id):
-        return "❌ Error: Invalid subaccount ID format. It should be a technical GUID."
+    if not _GUID_RE.match(subaccount_id):
+        return _INVALID_GUID
     
-    return format_response(cli.get_subaccount(subaccount_id))
+    return format_response(await cli.get_subaccount(subaccount_id))
 
 @mcp.tool()
 @handle_btp_errors
-def btp_create_subaccount(
+async def btp_create_subaccount(
     display_name: str = Field(..., description="Human-readable name. Min length 1."),
     region: str = Field(..., description="Technical region ID (e.g. 'us10', 'eu10', 'ap21')."),
     subdomain: str = Field(..., description="Unique URL prefix. Must be lowercase, start with a letter, and contain only letters, numbers, and hyphens.")
@@ -155,186 +376,221 @@ def btp_create_subaccount(
     if not display_name or len(display_name.strip()) == 0:
         return "❌ Error: display_name cannot be empty."
     
-    if not re.match(r'^[a-z0-9-]+$', region):
+    if not _REGION_RE.match(region):
         return "❌ Error: region must be a technical ID (e.g., 'us10', 'cf-eu10')."
 
-    if not re.match(r'^[a-z][a-z0-9-]{0,62}$', subdomain):
+    if not _SUBDOMAIN_RE.match(subdomain):
         return "❌ Error: subdomain must start with a letter, be lowercase, contain only letters/numbers/hyphens, and be max 63 chars."
 
-    return format_response(cli.create_subaccount(display_name, region, subdomain))
+    return format_response(await cli.create_subaccount(display_name, region, subdomain))
 
-@mcp.tool()
-@handle_btp_errors
-def btp_delete_subaccount(
-    subaccount_id: str = Field(..., description="The GUID of the subaccount to delete."),
-    confirm: bool = Field(False, description="Explicitly set to True to confirm deletion without a prompt.")
-) -> str:
+btp_delete_subaccount = _cli_tool(
+    "btp_delete_subaccount",
     """
     Delete a subaccount permanently. 
     WARNING: This will delete all resources within the subaccount.
-    """
-    return format_response(cli.delete_subaccount(subaccount_id, confirm))
-
-@mcp.tool()
-@handle_btp_errors
-def btp_get_global_account() -> str:
-    """Retrieve metadata about the current global account context, including its name and ID."""
-    return format_response(cli.get_global_account())
-
-@mcp.tool()
-@handle_btp_errors
-def btp_list_regions() -> str:
-    """List all technical regions available in the global account (e.g., 'us10', 'eu10')."""
-    return format_response(cli.list_regions())
-
-@mcp.tool()
-@handle_btp_errors
-def btp_list_directories() -> str:
-    """List all directories created within the global account hierarchy."""
-    return format_response(cli.list_directories())
+    """,
+    subaccount_id=(str, Field(..., description="The GUID of the subaccount to delete.")),
+    confirm=(bool, Field(False, description="Explicitly set to True to confirm deletion without a prompt.")),
+)
+
+btp_get_global_account = _cli_tool(
+    "btp_get_global_account",
+    "Retrieve metadata about the current global account context, including its name and ID.",
+)
+
+btp_list_regions = _cli_tool(
+    "btp_list_regions",
+    "List all technical regions available in the global account (e.g., 'us10', 'eu10').",
+)
+
+btp_list_directories = _cli_tool(
+    "btp_list_directories",
+    "List all directories created within the global account hierarchy.",
+)
 
 # ======================
 # --- Security Tools ---
 # ======================
 
-@mcp.tool()
-@handle_btp_errors
-def btp_list_users() -> str:
-    """List all users who have been added to the current global account or custom IdP."""
-    return format_response(cli.list_users())
+btp_list_users = _cli_tool(
+    "btp_list_users",
+    "List all users who have been added to the current global account or custom IdP.",
+)
 
 @mcp.tool()
 @handle_btp_errors
-def btp_get_user(
+async def btp_get_user(
     email: str = Field(..., description="The login email address of the user.")
 ) -> str:
     """Get security details and role assignments for a specific user."""
-    if "@" not in email:
-        return "❌ Error: Please provide a valid email address."
-    return format_response(cli.get_user(email))
-
-@mcp.tool()
-@handle_btp_errors
-def btp_list_role_collections() -> str:
-    """List all available role collections in the global account context."""
-    return format_response(cli.list_role_collections())
-
-@mcp.tool()
-@handle_btp_errors
-def btp_assign_role_collection(
-    role_collection_name: str = Field(..., description="Exact name of the role collection."),
-    user_email: str = Field(..., description="Email of the target user.")
-) -> str:
-    """Grant a role collection (group of permissions) to a user."""
-    return format_response(cli.assign_role_collection(role_collection_name, user_email))
-
-@mcp.tool()
-@handle_btp_errors
-def btp_unassign_role_collection(
-    role_collection_name: str = Field(..., description="Name of the role collection to remove."),
-    user_email: str = Field(..., description="Email of the user.")
-) -> str:
-    """Revoke a role collection from a user."""
-    return format_response(cli.unassign_role_collection(role_collection_name, user_email))
+    if not _EMAIL_RE.match(email):
+        return _INVALID_EMAIL
+    return format_response(await cli.get_user(email))
+
+btp_list_role_collections = _cli_tool(
+    "btp_list_role_collections",
+    "List all available role collections in the global account context.",
+)
+
+btp_assign_role_collection = _cli_tool(
+    "btp_assign_role_collection",
+    "Grant a role collection (group of permissions) to a user.",
+    role_collection_name=(str, Field(..., description="Exact name of the role collection.")),
+    user_email=(str, Field(..., description="Email of the target user.")),
+)
+
+btp_unassign_role_collection = _cli_tool(
+    "btp_unassign_role_collection",
+    "Revoke a role collection from a user.",
+    role_collection_name=(str, Field(..., description="Name of the role collection to remove.")),
+    user_email=(str, Field(..., description="Email of the user.")),
+)
 
 # ==========================
 # --- Entitlement Tools ---
 # ==========================
 
-@mcp.tool()
-@handle_btp_errors
-def btp_list_entitlements(
-    subaccount_id: str = Field(..., description="GUID of the subaccount to check.")
-) -> str:
+btp_list_entitlements = _cli_tool(
+    "btp_list_entitlements",
     """
     List service plans and quotas (entitlements) assigned to a subaccount.
     Useful for checking if a subaccount has enough 'units' to provision a service.
-    """
-    return format_response(cli.list_entitlements(subaccount_id))
+    """,
+    subaccount_id=(str, Field(..., description="GUID of the subaccount to check.")),
+)
 
-@mcp.tool()
-@handle_btp_errors
-def btp_assign_entitlement(
-    subaccount_id: str = Field(..., description="The ID of the subaccount to receive the entitlement."),
-    service_name: str = Field(..., description="Technical name of the service (e.g. 'hana', 'it-rt')."),
-    service_plan: str = Field(..., description="Name of the plan (e.g. 'hdi-shared', 'standard')."),
-    amount: Optional[int] = Field(None, description="The quota amount/units to allocate. If None, it might assign the plan without specific quota if applicable.")
-) -> str:
+btp_assign_entitlement = _cli_tool(
+    "btp_assign_entitlement",
     """
     Assign or increase service plan quota for a subaccount.
     This enables you to then create service instances of that plan in that subaccount.
-    """
-    return format_response(cli.assign_entitlement(subaccount_id, service_name, service_plan, amount))
-
-@mcp.tool()
-@handle_btp_errors
-def btp_remove_entitlement(
-    subaccount_id: str = Field(..., description="The ID of the subaccount."),
-    service_name: str = Field(..., description="Technical name of the service."),
-    service_plan: str = Field(..., description="Name of the plan.")
-) -> str:
+    """,
+    subaccount_id=(str, Field(..., description="The ID of the subaccount to receive the entitlement.")),
+    service_name=(str, Field(..., description="Technical name of the service (e.g. 'hana', 'it-rt').")),
+    service_plan=(str, Field(..., description="Name of the plan (e.g. 'hdi-shared', 'standard').")),
+    amount=(Optional[int], Field(None, description="The quota amount/units to allocate. If None, it might assign the plan without specific quota if applicable.")),
+)
+
+btp_remove_entitlement = _cli_tool(
+    "btp_remove_entitlement",
     """
     Remove an entitlement (service plan quota) from a subaccount.
     Useful for freeing up global quota or cleaning up unused services.
-    """
-    return format_response(cli.remove_entitlement(subaccount_id, service_name, service_plan))
+    """,
+    subaccount_id=(str, _SUBACCOUNT_ID_FIELD),
+    service_name=(str, Field(..., description="Technical name of the service.")),
+    service_plan=(str, Field(..., description="Name of the plan.")),
+)
 
 # =====================
 # --- Service Tools ---
 # =====================
 
+async def _list_per_subaccount(subaccount_ids: List[str], method_name: str) -> str:
+    """
+    Run a per-subaccount listing concurrently for each (deduplicated) subaccount.
+    The CLI's BTP_MAX_CONCURRENCY semaphore bounds the number of parallel processes.
+    """
+    results = await cli.gather_for_subaccounts(list(dict.fromkeys(subaccount_ids)), method_name)
+    return format_response({
+        sid: {"error": str(r)} if isinstance(r, Exception) else r
+        for sid, r in results.items()
+    })
+
+btp_list_service_instances = _cli_tool(
+    "btp_list_service_instances",
+    "List all service instances (active services) in a subaccount.",
+    subaccount_id=(str, _SUBACCOUNT_ID_FIELD),
+)
+
 @mcp.tool()
 @handle_btp_errors
-def btp_list_service_instances(
-    subaccount_id: str = Field(..., description="The ID of the subaccount.")
-) -> str:
-    """List all service instances (active services) in a subaccount."""
-    return format_response(cli.list_service_instances(subaccount_id))
+async def btp_list_all_service_instances() -> str:
+    """
+    List service instances across ALL subaccounts in a single call.
+    Prefer this over calling 'btp_list_service_instances' once per subaccount.
+
+    Returns a mapping of subaccount ID to its service instances. A subaccount that
+    cannot be queried contains an 'error' message instead.
+    """
+    subaccounts = await cli.list_subaccounts()
+    # The CLI wraps the list in 'value' (or 'items'), depending on the version
+    if isinstance(subaccounts, dict):
+        subaccounts = subaccounts.get("value", subaccounts.get("items"))
+    if not isinstance(subaccounts, list):
+        # Raw or unexpected output must not be reported as "no subaccounts"
+        return "❌ Error: could not read the subaccount list from the BTP CLI response."
+    subaccount_ids = [s["guid"] for s in subaccounts if isinstance(s, dict) and s.get("guid")]
+    return await _list_per_subaccount(subaccount_ids, "list_service_instances")
 
 @mcp.tool()
 @handle_btp_errors
-def btp_list_service_bindings(
-    subaccount_id: str = Field(..., description="The ID of the subaccount.")
+async def btp_list_service_instances_multi(
+    subaccount_ids: List[str] = _SUBACCOUNT_IDS_FIELD
 ) -> str:
-    """List service bindings (credentials for applications) in a subaccount."""
-    return format_response(cli.list_service_bindings(subaccount_id))
+    """
+    List service instances of several subaccounts in a single call.
+    Returns a mapping of subaccount ID to its service instances (or an 'error' message).
+    """
+    return await _list_per_subaccount(subaccount_ids, "list_service_instances")
+
+btp_list_service_bindings = _cli_tool(
+    "btp_list_service_bindings",
+    "List service bindings (credentials for applications) in a subaccount.",
+    subaccount_id=(str, _SUBACCOUNT_ID_FIELD),
+)
 
 @mcp.tool()
 @handle_btp_errors
-def btp_list_environment_instances(
-    subaccount_id: str = Field(..., description="The ID of the subaccount.")
+async def btp_list_service_bindings_multi(
+    subaccount_ids: List[str] = _SUBACCOUNT_IDS_FIELD
 ) -> str:
-    """List all environment instances (e.g., Cloud Foundry, Kyma) in a subaccount."""
-    return format_response(cli.list_environment_instances(subaccount_id))
+    """
+    List service bindings of several subaccounts in a single call.
+    Returns a mapping of subaccount ID to its service bindings (or an 'error' message).
+    """
+    return await _list_per_subaccount(subaccount_ids, "list_service_bindings")
+
+btp_list_environment_instances = _cli_tool(
+    "btp_list_environment_instances",
+    "List all environment instances (e.g., Cloud Foundry, Kyma) in a subaccount.",
+    subaccount_id=(str, _SUBACCOUNT_ID_FIELD),
+)
+
+btp_list_subscriptions = _cli_tool(
+    "btp_list_subscriptions",
+    "List multi-tenant application subscriptions in a subaccount.",
+    subaccount_id=(str, _SUBACCOUNT_ID_FIELD),
+)
 
 @mcp.tool()
 @handle_btp_errors
-def btp_list_subscriptions(
-    subaccount_id: str = Field(..., description="The ID of the subaccount.")
+async def btp_list_subscriptions_multi(
+    subaccount_ids: List[str] = _SUBACCOUNT_IDS_FIELD
 ) -> str:
-    """List multi-tenant application subscriptions in a subaccount."""
-    return format_response(cli.list_subscriptions(subaccount_id))
+    """
+    List application subscriptions of several subaccounts in a single call.
+    Returns a mapping of subaccount ID to its subscriptions (or an 'error' message).
+    """
+    return await _list_per_subaccount(subaccount_ids, "list_subscriptions")
 
 # ==========================
 # --- Connectivity Tools ---
 # ==========================
 
-@mcp.tool()
-@handle_btp_errors
-def btp_list_destinations(
-    subaccount_id: str = Field(..., description="The ID of the subaccount.")
-) -> str:
-    """List all destinations (HTTP/RFC connections) in a subaccount."""
-    return format_response(cli.list_destinations(subaccount_id))
-
-@mcp.tool()
-@handle_btp_errors
-def btp_get_destination(
-    subaccount_id: str = Field(..., description="The ID of the subaccount."),
-    destination_name: str = Field(..., description="Name of the destination.")
-) -> str:
-    """Get the full configuration (URL, authentication, proxy) of a specific destination."""
-    return format_response(cli.get_destination(subaccount_id, destination_name))
+btp_list_destinations = _cli_tool(
+    "btp_list_destinations",
+    "List all destinations (HTTP/RFC connections) in a subaccount.",
+    subaccount_id=(str, _SUBACCOUNT_ID_FIELD),
+)
+
+btp_get_destination = _cli_tool(
+    "btp_get_destination",
+    "Get the full configuration (URL, authentication, proxy) of a specific destination.",
+    subaccount_id=(str, _SUBACCOUNT_ID_FIELD),
+    destination_name=(str, Field(..., description="Name of the destination.")),
+)
 
 def main():
     """Start the MCP server via stdio."""
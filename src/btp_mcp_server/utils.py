@@ -1,6 +1,14 @@
+import json
 import logging
 import sys
-from typing import Optional
+from typing import Any, Optional, Tuple, Union
+
+# orjson is an optional speedup (pip install "btp-mcp-server[fast]").
+# It reads and writes UTF-8 bytes natively; the stdlib json module is the fallback.
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
 
 # --- Logging Configuration ---
 # We configure the root logger to output to stderr.
@@ -17,6 +25,24 @@ logging.basicConfig(
 logger = logging.getLogger("btp-mcp-server")
 
 
+# --- JSON Helpers ---
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON from str or UTF-8 bytes. Raises a json.JSONDecodeError subclass on invalid input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(data: Any, pretty: bool = False) -> str:
+    """Serialize data as compact JSON, or indented by two spaces if pretty is set."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(data, option=option).decode()
+    if pretty:
+        return json.dumps(data, indent=2)
+    return json.dumps(data, separators=(",", ":"))
+
+
 class BTPError(Exception):
     """
     Base exception class for all SAP BTP CLI related errors.
@@ -27,6 +53,8 @@ class BTPError(Exception):
         stdout (str, optional): The standard output from the failed command.
         stderr (str, optional): The error output from the failed command.
     """
+    # Slots keep these attributes out of a per-instance __dict__
+    __slots__ = ("return_code", "stdout", "stderr")
 
     def __init__(self, message: str, return_code: Optional[int] = None, stdout: Optional[str] = None, stderr: Optional[str] = None):
         super().__init__(message)
@@ -34,13 +62,17 @@ class BTPError(Exception):
         self.stdout = stdout
         self.stderr = stderr
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # BaseException.__reduce__ only carries args and __dict__, which would drop the slots
+        return (type(self), (self.args[0], self.return_code, self.stdout, self.stderr))
+
 
 class BTPLoginError(BTPError):
     """
     Raised specifically when a command fails because the user is not 
     authenticated or the session has expired in the BTP CLI.
     """
-    pass
+    __slots__ = ()
 
 
 class BTPCommandError(BTPError):
@@ -48,5 +80,5 @@ class BTPCommandError(BTPError):
     Raised when the BTP CLI returns a non-zero exit code due to 
     invalid arguments, missing permissions, or server-side issues.
     """
-    pass
+    __slots__ = ()
 
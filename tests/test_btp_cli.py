@@ -1,96 +1,250 @@
+import asyncio
+import copy
+import pickle
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 import json
-from btp_mcp_server.btp_cli import BTPCLI, BTPError, BTPCommandError, BTPLoginError
+from btp_mcp_server.btp_cli import BTPCLI, BTPError, BTPCommandError, BTPLoginError, _find_btp_binary
 
-class TestBTPCLI(unittest.TestCase):
+def mock_process(stdout=b"", stderr=b"", returncode=0):
+    """Build a fake asyncio subprocess that returns the given output."""
+    proc = MagicMock()
+    proc.returncode = returncode
+    proc.communicate = AsyncMock(return_value=(stdout, stderr))
+    proc.wait = AsyncMock(return_value=returncode)
+    return proc
+
+class TestBTPCLI(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self):
         self.btp = BTPCLI(cli_path="/mock/btp")
 
-    @patch("subprocess.run")
-    def test_execute_success(self, mock_run):
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = '{"key": "value"}'
-        mock_result.stderr = ""
-        mock_run.return_value = mock_result
+    @patch("asyncio.create_subprocess_exec")
+    async def test_execute_success(self, mock_run):
+        mock_run.return_value = mock_process(b'{"key": "value"}')
 
-        result = self.btp._execute(["test", "command"])
+        result = await self.btp._execute_async(["test", "command"])
         self.assertEqual(result, {"key": "value"})
 
-    @patch("subprocess.run")
-    def test_create_subaccount(self, mock_run):
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = '{"id": "new-subaccount-id"}'
-        mock_result.stderr = ""
-        mock_run.return_value = mock_result
+    @patch("shutil.which", return_value="/usr/bin/btp")
+    def test_binary_lookup_is_cached(self, mock_which):
+        _find_btp_binary.cache_clear()
+        try:
+            self.assertEqual(BTPCLI().cli_path, "/usr/bin/btp")
+            self.assertEqual(BTPCLI().cli_path, "/usr/bin/btp")
+            mock_which.assert_called_once()
+        finally:
+            _find_btp_binary.cache_clear()
+
+    def test_errors_survive_copy_and_pickle(self):
+        error = BTPCommandError("Failed", 1, "out", "err")
+        for clone in (copy.copy(error), pickle.loads(pickle.dumps(error))):
+            self.assertIs(type(clone), BTPCommandError)
+            self.assertEqual(str(clone), "Failed")
+            self.assertEqual((clone.return_code, clone.stdout, clone.stderr), (1, "out", "err"))
+
+    def test_sanitize_param(self):
+        self.assertEqual(self.btp._sanitize_param("  my\r\nname\n "), "my name")
+        self.assertEqual(self.btp._sanitize_param(5), "5")
+
+    def test_parse_json_with_warning_prefix(self):
+        stdout = 'Warning: [deprecated] option\n{"items": [{"id": 1}]}\nOK\n'
+        self.assertEqual(self.btp._parse_json_safely(stdout, ""), {"items": [{"id": 1}]})
+
+    def test_parse_json_raw_fallback(self):
+        result = self.btp._parse_json_safely("plain text output", "")
+        self.assertTrue(result["is_raw"])
+
+    def test_parse_json_truncated_document_is_raw(self):
+        stdout = 'Warning: slow\n{\n  "value": [\n    {"guid": "a", "name": "one"},\n    {"guid": "b", '
+        self.assertTrue(self.btp._parse_json_safely(stdout, "")["is_raw"])
+        self.assertTrue(self.btp._parse_json_safely(stdout.encode(), "")["is_raw"])
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_execute_timeout_kills_process(self, mock_run):
+        proc = mock_process()
+        proc.communicate = AsyncMock(side_effect=asyncio.TimeoutError)
+        proc.wait = AsyncMock(return_value=-9)
+        mock_run.return_value = proc
+
+        with self.assertRaises(BTPError):
+            await self.btp._execute_async(["list", "accounts/subaccount"], timeout=1)
+        proc.kill.assert_called_once()
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_execute_cancel_kills_process(self, mock_run):
+        proc = mock_process(returncode=None)
+        proc.communicate = AsyncMock(side_effect=asyncio.CancelledError)
+        mock_run.return_value = proc
+
+        with self.assertRaises(asyncio.CancelledError):
+            await self.btp._execute_async(["list", "accounts/subaccount"], timeout=1)
+        proc.kill.assert_called_once()
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_execute_login_error(self, mock_run):
+        mock_run.return_value = mock_process(b"", b"Session EXPIRED. Please log in again.", 1)
+
+        with self.assertRaises(BTPLoginError):
+            await self.btp._execute_async(["list", "accounts/subaccount"])
+
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    @patch("asyncio.create_subprocess_exec")
+    async def test_retry_on_transient_error(self, mock_run, mock_sleep):
+        mock_run.side_effect = [OSError("spawn failed"), mock_process(b'{"ok": true}')]
+
+        result = await self.btp._execute_with_retry(["get", "accounts/global-account"])
+        self.assertEqual(result, {"ok": True})
+        mock_sleep.assert_awaited_once()
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_execute_command_error_message(self, mock_run):
+        stdout = b'Warning: x\n{"error": {"message": "Subaccount not found"}}\nFAILED\n'
+        mock_run.return_value = mock_process(stdout, b"", 1)
 
-        self.btp.create_subaccount("My Subaccount", "us10", "my-subdomain")
+        with self.assertRaises(BTPCommandError) as ctx:
+            await self.btp._execute_async(["get", "accounts/subaccount"])
+        self.assertIn("Subaccount not found", str(ctx.exception))
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_create_subaccount(self, mock_run):
+        mock_run.return_value = mock_process(b'{"id": "new-subaccount-id"}')
+
+        await self.btp.create_subaccount("My Subaccount", "us10", "my-subdomain")
         
-        args, _ = mock_run.call_args
-        cmd_list = args[0]
+        cmd_list, _ = mock_run.call_args
         self.assertIn("create", cmd_list)
         self.assertIn("accounts/subaccount", cmd_list)
         self.assertIn("My Subaccount", cmd_list)
         self.assertIn("us10", cmd_list)
         self.assertIn("my-subdomain", cmd_list)
 
-    @patch("subprocess.run")
-    def test_entitlements(self, mock_run):
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = "{}"
-        mock_result.stderr = ""
-        mock_run.return_value = mock_result
+    @patch("asyncio.create_subprocess_exec")
+    async def test_entitlements(self, mock_run):
+        mock_run.return_value = mock_process(b"{}")
 
-        self.btp.assign_entitlement("sub-id", "service-x", "plan-y", 5)
+        await self.btp.assign_entitlement("sub-id", "service-x", "plan-y", 5)
         
-        args, _ = mock_run.call_args
-        cmd_list = args[0]
+        cmd_list, _ = mock_run.call_args
         self.assertIn("assign", cmd_list)
         self.assertIn("accounts/entitlement", cmd_list)
         self.assertIn("--amount", cmd_list)
         self.assertIn("5", cmd_list)
 
-    @patch("subprocess.run")
-    def test_security_tools(self, mock_run):
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = "{}"
-        mock_result.stderr = ""
-        mock_run.return_value = mock_result
+    @patch("asyncio.create_subprocess_exec")
+    async def test_security_tools(self, mock_run):
+        mock_run.return_value = mock_process(b"{}")
 
-        self.btp.assign_role_collection("Admin", "user@test.com")
+        await self.btp.assign_role_collection("Admin", "user@test.com")
         
-        args, _ = mock_run.call_args
-        cmd_list = args[0]
+        cmd_list, _ = mock_run.call_args
         self.assertIn("assign", cmd_list)
         self.assertIn("security/role-collection", cmd_list)
         self.assertIn("Admin", cmd_list)
         self.assertIn("user@test.com", cmd_list)
 
-    @patch("subprocess.run")
-    def test_list_regions(self, mock_run):
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = '[]'
-        mock_run.return_value = mock_result
-        self.btp.list_regions()
-        args, _ = mock_run.call_args
-        self.assertIn("accounts/region", args[0])
-
-    @patch("subprocess.run")
-    def test_list_environment_instances(self, mock_run):
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = '[]'
-        mock_run.return_value = mock_result
-        self.btp.list_environment_instances("sub1")
-        args, _ = mock_run.call_args
-        self.assertIn("accounts/environment-instance", args[0])
-        self.assertIn("sub1", args[0])
+    @patch("asyncio.create_subprocess_exec")
+    async def test_list_regions(self, mock_run):
+        mock_run.return_value = mock_process(b'[]')
+        await self.btp.list_regions()
+        cmd_list, _ = mock_run.call_args
+        self.assertIn("accounts/region", cmd_list)
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_list_environment_instances(self, mock_run):
+        mock_run.return_value = mock_process(b'[]')
+        await self.btp.list_environment_instances("sub1")
+        cmd_list, _ = mock_run.call_args
+        self.assertIn("accounts/environment-instance", cmd_list)
+        self.assertIn("sub1", cmd_list)
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_read_commands_are_cached(self, mock_run):
+        mock_run.return_value = mock_process(b'[{"guid": "sub1"}]')
+        first = await self.btp.list_subaccounts()
+        second = await self.btp.list_subaccounts()
+        self.assertEqual(first, second)
+        self.assertEqual(mock_run.call_count, 1)
+
+    @patch.dict("os.environ", {"BTP_MAX_CONCURRENCY": "0"})
+    def test_max_concurrency_is_at_least_one(self):
+        self.assertEqual(BTPCLI(cli_path="/mock/btp").max_concurrency, 1)
+        self.assertEqual(BTPCLI(cli_path="/mock/btp", max_concurrency=0).max_concurrency, 1)
+        with patch.dict("os.environ", {"BTP_MAX_CONCURRENCY": "many"}):
+            self.assertEqual(BTPCLI(cli_path="/mock/btp").max_concurrency, 8)
+
+    @patch.dict("os.environ", {"BTP_CACHE_TTL": "soon"})
+    def test_invalid_cache_ttl_env_uses_default(self):
+        self.assertEqual(BTPCLI(cli_path="/mock/btp").cache_ttl, 30)
+
+    @patch.dict("os.environ", {"BTP_CACHE_TTL": "0"})
+    @patch("asyncio.create_subprocess_exec")
+    async def test_cache_ttl_env_disables_cache(self, mock_run):
+        mock_run.return_value = mock_process(b'[{"guid": "sub1"}]')
+        btp = BTPCLI(cli_path="/mock/btp")
+        await btp.list_subaccounts()
+        await btp.list_subaccounts()
+        self.assertEqual(mock_run.call_count, 2)
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_concurrent_identical_reads_are_coalesced(self, mock_run):
+        mock_run.return_value = mock_process(b'[{"guid": "sub1"}]')
+        first, second = await asyncio.gather(self.btp.list_subaccounts(), self.btp.list_subaccounts())
+        self.assertEqual(first, second)
+        self.assertEqual(mock_run.call_count, 1)
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_login_error_clears_cache(self, mock_run):
+        mock_run.side_effect = [
+            mock_process(b'{"guid": "ga"}'),
+            mock_process(b"", b"Not logged in", 1),
+            mock_process(b'{"guid": "ga"}'),
+        ]
+        self.assertTrue(await self.btp.ping())
+        with self.assertRaises(BTPLoginError):
+            await self.btp.list_users()
+        # The cached global account is gone, so ping must hit the CLI again
+        self.assertTrue(await self.btp.ping())
+        self.assertEqual(mock_run.call_count, 3)
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_run_command_param_order_shares_cache(self, mock_run):
+        mock_run.return_value = mock_process(b'{}')
+        await self.btp.run_command("get", "connectivity/destination", {"subaccount": "s1", "name": "d1"})
+        await self.btp.run_command("GET", "connectivity/destination", {"--name": "d1", "subaccount": "s1"})
+        self.assertEqual(mock_run.call_count, 1)
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_run_command_duplicate_option_names(self, mock_run):
+        mock_run.return_value = mock_process(b'[]')
+        await self.btp.run_command("list", "accounts/subaccount", {"a": 1, "--a": "x"})
+        self.assertEqual(mock_run.call_args[0][-4:], ("--a", "1", "--a", "x"))
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_wrapper_and_run_command_share_cache(self, mock_run):
+        mock_run.return_value = mock_process(b'{}')
+        await self.btp.get_destination("s1", "d1")
+        await self.btp.run_command("get", "connectivity/destination", {"subaccount": "s1", "name": "d1"})
+        self.assertEqual(mock_run.call_count, 1)
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_write_commands_invalidate_cache(self, mock_run):
+        mock_run.return_value = mock_process(b'[]')
+        await self.btp.list_entitlements("sub1")
+        await self.btp.delete_subaccount("sub1", confirm=True)
+        await self.btp.list_entitlements("sub1")
+        self.assertEqual(mock_run.call_count, 3)
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_gather_for_subaccounts(self, mock_run):
+        mock_run.side_effect = [mock_process(b'[{"name": "a"}]'), mock_process(b'', b'not found', 1)]
+        results = await self.btp.gather_for_subaccounts(["sub1", "sub2"], "list_service_instances")
+        self.assertEqual(results["sub1"], [{"name": "a"}])
+        self.assertIsInstance(results["sub2"], BTPCommandError)
+
+    async def test_gather_calls_rejects_unknown_method(self):
+        with self.assertRaises(ValueError):
+            await self.btp.gather_calls([("_execute_async", {"args": []})])
 
 if __name__ == "__main__":
     unittest.main()
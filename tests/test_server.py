@@ -1,69 +1,195 @@
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 import json
 from btp_mcp_server.server import (
     btp_ping, btp_list_subaccounts, btp_get_subaccount, 
-    btp_create_subaccount, btp_get_global_account, handle_btp_errors
+    btp_create_subaccount, btp_get_global_account, handle_btp_errors, format_response
 )
 from btp_mcp_server.btp_cli import BTPLoginError, BTPCommandError, BTPError
 
-class TestServerTools(unittest.TestCase):
+class TestServerTools(unittest.IsolatedAsyncioTestCase):
 
-    @patch("btp_mcp_server.server.cli")
-    def test_btp_ping_success(self, mock_cli):
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_ping_success(self, mock_cli):
         mock_cli.ping.return_value = True
-        result = btp_ping()
+        result = await btp_ping()
         self.assertIn("✅ Success", result)
 
-    @patch("btp_mcp_server.server.cli")
-    def test_btp_ping_login_error(self, mock_cli):
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_ping_login_error(self, mock_cli):
         mock_cli.ping.side_effect = BTPLoginError("Not logged in", 1, "", "Please log in")
-        result = btp_ping()
+        result = await btp_ping()
         self.assertIn("❌ AUTHENTICATION ERROR", result)
         self.assertIn("btp login", result)
 
-    @patch("btp_mcp_server.server.cli")
-    def test_btp_list_subaccounts(self, mock_cli):
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_list_subaccounts(self, mock_cli):
         mock_cli.list_subaccounts.return_value = {"items": [{"id": "sub1", "name": "Sub 1"}]}
-        result = btp_list_subaccounts()
+        result = await btp_list_subaccounts()
         data = json.loads(result)
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]["id"], "sub1")
 
-    @patch("btp_mcp_server.server.cli")
-    def test_btp_get_subaccount_invalid_id(self, mock_cli):
-        result = btp_get_subaccount(subaccount_id="invalid id!")
+    def test_format_response_unwraps_dict_subclass(self):
+        from collections import OrderedDict
+        self.assertEqual(json.loads(format_response(OrderedDict(items=[{"id": "sub1"}]))), [{"id": "sub1"}])
+
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_get_subaccount_invalid_id(self, mock_cli):
+        result = await btp_get_subaccount(subaccount_id="invalid id!")
         self.assertIn("❌ Error: Invalid subaccount ID format", result)
 
-    @patch("btp_mcp_server.server.cli")
-    def test_btp_create_subaccount_validation(self, mock_cli):
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_create_subaccount_validation(self, mock_cli):
         # Empty display name
-        result = btp_create_subaccount(display_name="", region="us10", subdomain="test")
+        result = await btp_create_subaccount(display_name="", region="us10", subdomain="test")
         self.assertIn("❌ Error: display_name cannot be empty", result)
         
         # Invalid subdomain
-        result = btp_create_subaccount(display_name="Test", region="us10", subdomain="Invalid_Subdomain")
-        self.assertIn("❌ Error: subdomain must be lowercase", result)
+        result = await btp_create_subaccount(display_name="Test", region="us10", subdomain="Invalid_Subdomain")
+        self.assertIn("❌ Error: subdomain must start with a letter", result)
+
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_get_user_validation(self, mock_cli):
+        from btp_mcp_server.server import btp_get_user
+        result = await btp_get_user(email="user@example.com extra")
+        self.assertIn("❌ Error: Please provide a valid email address", result)
+        mock_cli.get_user.assert_not_called()
 
-    @patch("btp_mcp_server.server.cli")
-    def test_btp_get_global_account(self, mock_cli):
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_get_global_account(self, mock_cli):
         mock_cli.get_global_account.return_value = {"name": "Global Admin"}
-        result = btp_get_global_account()
+        result = await btp_get_global_account()
         self.assertIn("Global Admin", result)
 
-    @patch("btp_mcp_server.server.cli")
-    def test_btp_list_regions(self, mock_cli):
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_list_regions(self, mock_cli):
         mock_cli.list_regions.return_value = [{"name": "us10"}]
         from btp_mcp_server.server import btp_list_regions
-        result = btp_list_regions()
+        result = await btp_list_regions()
         self.assertIn("us10", result)
 
-    @patch("btp_mcp_server.server.cli")
-    def test_btp_list_environment_instances(self, mock_cli):
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_list_environment_instances(self, mock_cli):
         mock_cli.list_environment_instances.return_value = [{"id": "env1"}]
         from btp_mcp_server.server import btp_list_environment_instances
-        result = btp_list_environment_instances("sub1")
+        result = await btp_list_environment_instances("sub1")
         self.assertIn("env1", result)
 
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_bulk_execute(self, mock_cli):
+        from btp_mcp_server.server import btp_bulk_execute, BulkCommand
+        mock_cli.run_command.side_effect = [[{"id": "inst1"}], BTPCommandError("Subaccount not found", 1)]
+        result = await btp_bulk_execute([
+            BulkCommand(action="list", group_object="services/instance", parameters={"subaccount": "s1"}),
+            BulkCommand(action="list", group_object="services/instance", parameters={"subaccount": "s2"}),
+        ])
+        data = json.loads(result)
+        self.assertEqual(data[0], [{"id": "inst1"}])
+        self.assertIn("Subaccount not found", data[1]["error"])
+
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_list_all_service_instances(self, mock_cli):
+        from btp_mcp_server.server import btp_list_all_service_instances
+        mock_cli.list_subaccounts.return_value = {"value": [{"guid": "s1"}, {"guid": "s2"}]}
+        mock_cli.gather_for_subaccounts.return_value = {
+            "s1": [{"id": "inst1"}],
+            "s2": BTPCommandError("Forbidden", 1),
+        }
+        data = json.loads(await btp_list_all_service_instances())
+        mock_cli.gather_for_subaccounts.assert_called_once_with(["s1", "s2"], "list_service_instances")
+        self.assertEqual(data["s1"], [{"id": "inst1"}])
+        self.assertIn("Forbidden", data["s2"]["error"])
+
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_list_all_service_instances_unreadable_subaccounts(self, mock_cli):
+        from btp_mcp_server.server import btp_list_all_service_instances
+        for response in ({"raw_output": "oops", "is_raw": True}, {"guid": "s1"}):
+            mock_cli.list_subaccounts.return_value = response
+            result = await btp_list_all_service_instances()
+            self.assertIn("could not read the subaccount list", result)
+        mock_cli.gather_for_subaccounts.assert_not_called()
+
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_list_subscriptions_multi(self, mock_cli):
+        from btp_mcp_server.server import btp_list_subscriptions_multi
+        mock_cli.gather_for_subaccounts.return_value = {"s1": [{"appName": "app1"}], "s2": []}
+        data = json.loads(await btp_list_subscriptions_multi(["s1", "s2", "s1"]))
+        mock_cli.gather_for_subaccounts.assert_called_once_with(["s1", "s2"], "list_subscriptions")
+        self.assertEqual(data["s1"], [{"appName": "app1"}])
+
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_batch(self, mock_cli):
+        from btp_mcp_server.server import btp_batch, BatchCall
+        mock_cli.list_subaccounts.return_value = {"value": [{"guid": "s1"}]}
+        mock_cli.list_entitlements.return_value = [{"service": "hana"}]
+        mock_cli.list_regions.side_effect = BTPCommandError("Forbidden", 1)
+        data = json.loads(await btp_batch([
+            BatchCall(call_id=1, tool="btp_list_subaccounts"),
+            BatchCall(call_id=2, tool="btp_list_entitlements", params={"subaccount_id": "$result.value.0.guid"}, input_from=1),
+            BatchCall(call_id=3, tool="btp_list_regions"),
+            BatchCall(call_id=4, tool="btp_list_directories", input_from=3),
+            BatchCall(call_id=5, tool="btp_delete_subaccount", params={"subaccount_id": "s1"}),
+        ]))
+        mock_cli.list_entitlements.assert_called_once_with(subaccount_id="s1")
+        self.assertEqual(data["2"], [{"service": "hana"}])
+        self.assertIn("Forbidden", data["3"]["error"])
+        self.assertIn("INVALID_ARGUMENT", data["4"]["error"])
+        self.assertIn("INVALID_ARGUMENT", data["5"]["error"])
+        mock_cli.list_directories.assert_not_called()
+        mock_cli.delete_subaccount.assert_not_called()
+
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_batch_validates_inputs(self, mock_cli):
+        from btp_mcp_server.server import btp_batch, BatchCall
+        mock_cli.list_subaccounts.return_value = {"value": [{"guid": "s1"}]}
+        mock_cli.list_entitlements.return_value = []
+        data = json.loads(await btp_batch([
+            BatchCall(call_id=1, tool="btp_get_subaccount", params={"subaccount_id": "not a guid!"}),
+            BatchCall(call_id=2, tool="btp_get_user", params={"email": "nobody"}),
+            BatchCall(call_id=3, tool="btp_list_subaccounts"),
+            BatchCall(call_id=4, tool="btp_list_entitlements", params={"subaccount_id": "$resultsabc"}, input_from=3),
+        ]))
+        self.assertIn("Invalid subaccount ID", data["1"]["error"])
+        self.assertIn("valid email", data["2"]["error"])
+        mock_cli.get_subaccount.assert_not_called()
+        mock_cli.get_user.assert_not_called()
+        # Only an exact '$result' or a '$result.' path is substituted
+        mock_cli.list_entitlements.assert_called_once_with(subaccount_id="$resultsabc")
+
+    @patch("btp_mcp_server.server.cli", new_callable=AsyncMock)
+    async def test_btp_batch_rejects_bad_placeholders(self, mock_cli):
+        from btp_mcp_server.server import btp_batch, BatchCall
+        mock_cli.list_subaccounts.return_value = {"value": [{"guid": "s1"}]}
+        data = json.loads(await btp_batch([
+            BatchCall(call_id=1, tool="btp_list_entitlements", params={"subaccount_id": "$result"}),
+            BatchCall(call_id=2, tool="btp_list_subaccounts"),
+            BatchCall(call_id=3, tool="btp_list_service_instances", params={"subaccount_id": "$result.value"}, input_from=2),
+            BatchCall(call_id=4, tool="btp_list_subscriptions", params={"subaccount_id": "$result"}, input_from=2),
+        ]))
+        self.assertIn("requires 'input_from'", data["1"]["error"])
+        self.assertIn("not list", data["3"]["error"])
+        self.assertIn("not dict", data["4"]["error"])
+        mock_cli.list_entitlements.assert_not_called()
+        mock_cli.list_service_instances.assert_not_called()
+        mock_cli.list_subscriptions.assert_not_called()
+
+    def test_handle_btp_errors_sync_function(self):
+        @handle_btp_errors
+        def failing_tool():
+            raise BTPError("Connection reset")
+        self.assertIn("🚫 BTP SERVER ERROR", failing_tool())
+
+    async def test_tool_schema_keeps_parameters(self):
+        from btp_mcp_server.server import mcp
+        tools = {t.name: t for t in await mcp.list_tools()}
+        schema = tools["btp_get_subaccount"].inputSchema
+        self.assertEqual(schema["required"], ["subaccount_id"])
+        self.assertNotIn("kwargs", schema["properties"])
+        # Field metadata must survive the error-handling wrapper
+        self.assertIn("GUID", schema["properties"]["subaccount_id"]["description"])
+        for tool in tools.values():
+            self.assertNotIn("args", tool.inputSchema["properties"], tool.name)
+
 if __name__ == "__main__":
     unittest.main()